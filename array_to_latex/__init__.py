@@ -7,14 +7,38 @@ arrays to LaTeX form.
 
 # Note- version must also be set in setup.py
 __version__ = '0.92'
-__all__ = ['to_clp', 'to_ltx', '__version__']
+__all__ = ['to_clp', 'to_ltx', 'to_ltx_stream', 'write_ltx', 'to_ltx_many',
+           'LatexFormatter', 'LatexCache', 'IncrementalLatex', 'RenderStats',
+           '__version__']
 
 __author__ = u'Joseph C. Slater'
 __license__ = 'MIT'
 __copyright__ = 'Copyright 2018 Joseph C. Slater'
 
+import collections as _collections
+import contextlib as _contextlib
+import functools as _functools
+import hashlib as _hashlib
+import os as _os
+import re as _re
+import string as _string
+import sys as _sys
+import time as _time
+
 import numpy as _np
-import pandas as _pd
+
+# Format specs that `%`-style formatting reproduces exactly: no fill, alignment
+# or grouping, and a float (or, for integer arrays, `d`) presentation type.
+_PRINTF_SPEC = _re.compile(r'(?P<sign>[-+ ]?)(?P<alt>#?)(?P<zero>0?)'
+                           r'(?P<width>\d*)(?:\.(?P<precision>\d+))?'
+                           r'(?P<type>[eEfFgGd])$')
+
+# Splits a format spec around its sign option, after any fill and alignment.
+_SIGN_OPTION = _re.compile(r'(?P<align>(?:.?[<>=^])?)[-+ ]?(?P<rest>.*)$',
+                           _re.DOTALL)
+
+# Number of cells formatted at a time when rendering large arrays.
+_BLOCK_CELLS = 1 << 16
 
 
 def to_clp(a, frmt='{:1.2f}', arraytype='bmatrix', imstring='j'):
@@ -62,6 +86,247 @@ def to_clp(a, frmt='{:1.2f}', arraytype='bmatrix', imstring='j'):
               'means to use this function')
 
 
+class _CompiledFormat(object):
+    """A format string parsed once into what is needed to emit LaTeX cells.
+
+    Made by `_compile_format`; see there.
+    """
+
+    def __init__(self, frmt, mathform=True, imstring='j'):
+        self.frmt = frmt
+        self.imstring = imstring
+        self.exponent = '\\times 10^{' if mathform else '\\mathrm{e}{'
+        # `frmt` without its sign option, for the magnitudes of imaginary
+        # parts, which follow an explicit ` + ` or ` - `.
+        self.magnitude_frmt = frmt
+        # `%` equivalents of `frmt`, by dtype.
+        self._printf = {}
+        self.spec = None
+        # Whether finite numbers always/never contain an `e` or a `.`; None
+        # when it depends on the number.
+        self.has_e = None
+        self.has_dot = None
+
+        try:
+            fields = list(_string.Formatter().parse(frmt))
+        except ValueError:
+            return
+        if sum(field is not None for _, field, _, _ in fields) != 1:
+            return
+        literal, field, spec, conversion = fields[0]
+        suffix = ''.join(text for text, _, _, _ in fields[1:])
+        if spec is not None:
+            escape = {ord('{'): '{{', ord('}'): '}}'}
+            self.magnitude_frmt = (
+                literal.translate(escape) + '{' + field
+                + ('' if conversion is None else '!' + conversion)
+                + ':' + _SIGN_OPTION.sub(r'\g<align>\g<rest>', spec) + '}'
+                + suffix.translate(escape))
+        match = _PRINTF_SPEC.match(spec)
+        if field not in ('', '0') or conversion is not None or match is None:
+            return
+
+        self.spec = match.groupdict()
+        self.literal = literal
+        self.suffix = suffix
+        kind = self.spec['type']
+        text = literal + suffix
+        if 'e' in text:
+            pass
+        elif kind == 'e':
+            self.has_e = True
+        elif kind != 'g':
+            self.has_e = False
+        if '.' in text or (self.spec['alt'] and kind != 'd'):
+            self.has_dot = True
+        elif kind == 'd' or self.spec['precision'] == '0':
+            self.has_dot = False
+        elif kind in 'eEfF':
+            self.has_dot = True
+
+    def printf(self, dtype, signed=True):
+        """Return a `%` format equivalent to `frmt` for `dtype`, or None.
+
+        `frmt.format(x)` and `self.printf(dtype) % x` give identical strings
+        for every Python scalar `x` taken from an array of `dtype` (via
+        `tolist`). None means `frmt` can only be applied element by element.
+        With `signed` False the format matches `magnitude_frmt` instead.
+        """
+        key = (dtype, signed)
+        if key not in self._printf:
+            spec = self.spec
+            if (spec is None or dtype.kind not in 'fiu' or dtype.itemsize > 8
+                    or (spec['type'] == 'd' and dtype.kind == 'f')):
+                self._printf[key] = None
+            else:
+                precision = spec['precision']
+                self._printf[key] = (
+                    self.literal.replace('%', '%%') + '%'
+                    + (spec['sign'].replace('-', '') if signed else '')
+                    + spec['alt'] + spec['zero'] + spec['width']
+                    + ('' if precision is None else '.' + precision)
+                    + spec['type'] + self.suffix.replace('%', '%%'))
+        return self._printf[key]
+
+    def latex(self, number):
+        """Return formatted `number` with any `e` exponent written in LaTeX."""
+        if 'e' in number:
+            number = number.replace('e', self.exponent) + '}'
+        return number
+
+    def numbers(self, values):
+        """Return the numbers of a real numeric array formatted, flattened.
+
+        The whole array is formatted in one pass over `values.tolist()` when
+        `frmt` has a `%` equivalent, and element by element otherwise.
+        """
+        printf = self.printf(values.dtype)
+        if printf is None:
+            return [self.frmt.format(x) for x in values.ravel()]
+        return list(map(printf.__mod__, values.ravel().tolist()))
+
+    def cells(self, values, numbers):
+        """Return the LaTeX cells of a real numeric array, flattened.
+
+        `numbers` is `self.numbers(values)`.
+        """
+        negative = (values < 0).ravel().tolist()
+
+        if (self.printf(values.dtype) is None or self.has_dot is None
+                or self.has_e is None
+                or (values.dtype.kind == 'f' and not _np.isfinite(values).all())):
+            latex = self.latex
+            return [('' if neg else ' ')
+                    + latex(number)
+                    + ('' if '.' in number else ' ')
+                    for neg, number in zip(negative, numbers)]
+
+        dot_space = '' if self.has_dot else ' '
+        if self.has_e:
+            exponent = self.exponent
+            return [('' if neg else ' ')
+                    + number.replace('e', exponent) + '}'
+                    + dot_space
+                    for neg, number in zip(negative, numbers)]
+        return [('' if neg else ' ') + number + dot_space
+                for neg, number in zip(negative, numbers)]
+
+    def complex_numbers(self, values):
+        """Return the parts of a complex array formatted, flattened.
+
+        The real parts and the magnitudes of the imaginary parts are each
+        formatted in one pass, as in `numbers`. Returns None if `frmt` must
+        be applied to each complex number instead (see `cell`).
+        """
+        real = values.real.ravel()
+        printf = self.printf(real.dtype)
+        if printf is None or self.spec['type'] == 'd' or self.spec['zero']:
+            # Also leaves invalid complex formats to raise as usual.
+            return None
+        magnitude = self.printf(real.dtype, signed=False)
+        return (list(map(printf.__mod__, real.tolist())),
+                list(map(magnitude.__mod__,
+                         _np.abs(values.imag).ravel().tolist())))
+
+    def complex_cells(self, values, numbers):
+        r"""Return the LaTeX cells of a complex array, flattened.
+
+        `numbers` is `self.complex_numbers(values)`; the parts are joined
+        with the sign of the imaginary part.
+
+        >>> import numpy as np
+        >>> import array_to_latex as a2l
+        >>> print(a2l.to_ltx(np.array([[1-2j]]), print_out=False))
+        \begin{bmatrix}
+          1.00 - 2.00j
+        \end{bmatrix}
+
+        Sign options apply to the real part only:
+
+        >>> print(a2l.to_ltx(np.array([[1-2j]]), frmt='{:+.2f}',
+        ...                  print_out=False))
+        \begin{bmatrix}
+          +1.00 - 2.00j
+        \end{bmatrix}
+        >>> print(a2l.to_ltx(np.array([[1+2j]], dtype=object),
+        ...                  frmt='x{: .2f}', print_out=False))
+        \begin{bmatrix}
+          x 1.00 + x2.00j
+        \end{bmatrix}
+        """
+        latex = self.latex
+        imstring = self.imstring
+        cells = []
+        for neg, x, minus, y in zip((values.real < 0).ravel().tolist(),
+                                    numbers[0],
+                                    _np.signbit(values.imag).ravel().tolist(),
+                                    numbers[1]):
+            cells.append(('' if neg else ' ')
+                         + latex(x)
+                         + (' - ' if minus else ' + ')
+                         + latex(y)
+                         + imstring
+                         + ('' if '.' in x or '.' in y else ' '))
+        return cells
+
+    def cell(self, x):
+        """Return the LaTeX cell of a single number `x`, real or complex."""
+        frmt = self.frmt
+        leadstr = '' if _np.real(x) < 0 else ' '
+        dot_space = ' ' if '.' not in frmt.format(x) else ''
+        if _np.iscomplexobj(x):
+            imag = _np.imag(x)
+            return (leadstr
+                    + self.latex(frmt.format(_np.real(x)))
+                    + (' - ' if _np.signbit(imag) else ' + ')
+                    + self.latex(self.magnitude_frmt.format(abs(imag)))
+                    + self.imstring
+                    + dot_space)
+        return leadstr + self.latex(frmt.format(x)) + dot_space
+
+
+@_functools.lru_cache(maxsize=256)
+def _compile_format(frmt, mathform=True, imstring='j'):
+    """Return `frmt` compiled for formatting many numbers as LaTeX.
+
+    The format string is parsed once and, where possible, translated to an
+    equivalent `%` format. Whether its numbers can contain an exponent or a
+    decimal point is worked out in advance, so cells are built without
+    searching each formatted number. Compiled formats are cached by
+    `(frmt, mathform, imstring)`.
+    """
+    return _CompiledFormat(frmt, mathform=mathform, imstring=imstring)
+
+
+def _number_cells(values, fmt, stats):
+    """Return the LaTeX cells of a real or complex numeric array, flattened.
+
+    `fmt` is a compiled format from `_compile_format`. Time spent is added
+    to `stats`, a `RenderStats` or `_NO_STATS`.
+    """
+    if values.dtype.kind == 'c':
+        with stats.time('format'):
+            numbers = fmt.complex_numbers(values)
+            if numbers is None:
+                return [fmt.cell(x) for x in values.ravel()]
+        with stats.time('latex'):
+            return fmt.complex_cells(values, numbers)
+
+    with stats.time('format'):
+        numbers = fmt.numbers(values)
+    with stats.time('latex'):
+        return fmt.cells(values, numbers)
+
+
+def _string_cells(a, widths):
+    """Return the padded LaTeX cells of a 2-D string array as a list of rows.
+
+    Column `j` is padded to `widths[j]`, the length of its longest entry.
+    """
+    return [[' ' + text.ljust(width) for text, width in zip(row, widths)]
+            for row in a.tolist()]
+
+
 def _numpyarraytolatex(a, frmt='{:6.2f}', arraytype='bmatrix', nargout=0,
                        imstring='j', row=True, mathform=True):
     r"""Return a LaTeX array given a numpy array.
@@ -117,61 +382,370 @@ def _numpyarraytolatex(a, frmt='{:6.2f}', arraytype='bmatrix', nargout=0,
     None
 
     """
+    return ''.join(_numpyarraychunks(a, frmt=frmt, arraytype=arraytype,
+                                     imstring=imstring, row=row,
+                                     mathform=mathform))
+
+
+def _chunks(header, lines, footer, terminated=False):
+    """Yield `header`, then each line of an array, then `footer`.
+
+    Lines are separated by the LaTeX row break, or also followed by one if
+    `terminated` is True.
+    """
+    yield header
+    if terminated:
+        for line in lines:
+            yield line + '\\\\\n'
+    else:
+        separator = ''
+        for line in lines:
+            yield separator + line
+            separator = '\\\\\n'
+    yield footer
+
+
+def _blocks(nrows, ncols):
+    """Yield slices covering `nrows` rows, about `_BLOCK_CELLS` cells each."""
+    step = max(1, _BLOCK_CELLS // max(ncols, 1))
+    for start in range(0, nrows, step):
+        yield slice(start, start + step)
+
+
+def _string_widths(a):
+    """Return the length of the longest string in each column of `a`.
+
+    Columns that hold no strings get None.
+    """
+    if a.dtype.kind == 'U':
+        if a.shape[0] == 0:
+            return [0] * a.shape[1]
+        return _np.char.str_len(a).max(axis=0).tolist()
+    if a.dtype.kind != 'O':
+        return [None] * a.shape[1]
+    return [max(len(pet) for pet in column)
+            if any(isinstance(pet, str) for pet in column) else None
+            for column in a.T]
+
+
+def _numpyarraylines(a, frmt, imstring, mathform, widths=None,
+                     stats=None):
+    """Yield the rows of a 2-D numpy array as LaTeX, without row breaks.
+
+    `widths` are the string column widths of the whole array when `a` is
+    only a block of its rows. Counts and timings are added to `stats`, a
+    `RenderStats`, if given.
+
+    >>> import numpy as np
+    >>> list(_numpyarraylines(np.eye(2), '{:1.1f}', 'j', True))
+    ['  1.0 &  0.0', '  0.0 &  1.0']
+    >>> list(_numpyarraylines(np.zeros((2, 0)), '{:1.1f}', 'j', True))
+    [' ', ' ']
+    """
+    if stats is None:
+        stats = _NO_STATS
+    ncols = a.shape[1]
+    with stats.time('parse'):
+        fmt = _compile_format(frmt, mathform=mathform, imstring=imstring)
+    if a.dtype.kind in 'fiuc':
+        for block in _blocks(*a.shape):
+            cells = _number_cells(a[block], fmt, stats)
+            with stats.time('assembly'):
+                if ncols:
+                    lines = [' ' + ' & '.join(cells[i:i + ncols])
+                             for i in range(0, len(cells), ncols)]
+                else:
+                    # Rows without columns are blank, as for strings.
+                    lines = [' '] * len(a[block])
+            stats.count(len(lines), len(cells))
+            yield from lines
+        return
+
+    if widths is None:
+        with stats.time('pad'):
+            widths = _string_widths(a)
+
+    if a.dtype.kind == 'U':
+        for block in _blocks(*a.shape):
+            with stats.time('pad'):
+                rows = _string_cells(a[block], widths)
+            with stats.time('assembly'):
+                lines = [' ' + ' & '.join(row_cells) for row_cells in rows]
+            stats.count(len(lines), len(lines) * ncols)
+            yield from lines
+        return
+
+    for i in range(a.shape[0]):
+        with stats.time('format'):
+            cells = []
+            for j in range(ncols):
+                if isinstance(a[i, j], str):
+                    leadstr = ' '
+                    dot_space = (widths[j] - len(a[i, j])) * ' '
+                    cells.append(leadstr + a[i, j] + dot_space)
+                else:
+                    cells.append(fmt.cell(a[i, j]))
+        with stats.time('assembly'):
+            line = ' ' + ' & '.join(cells)
+        stats.count(1, ncols)
+        yield line
+
+
+def _numpyarraychunks(a, frmt='{:6.2f}', arraytype='bmatrix', imstring='j',
+                      row=True, mathform=True, edgeitems=None, maxpoints=None,
+                      workers=None, stats=None):
+    """Return an iterator over the pieces of the LaTeX for a numpy array."""
+    # np.matrix stays 2-D when raveled; formatting needs a plain array.
+    a = _np.asarray(a)
+    if edgeitems is not None and edgeitems < 1:
+        raise ValueError('edgeitems must be a positive integer')
+    if maxpoints is not None and maxpoints < 1:
+        raise ValueError('maxpoints must be a positive integer')
     if len(a.shape) > 2:
         raise ValueError('bmatrix can at most display two dimensions')
 
     if len(a.shape) == 1:
-        a = _np.array([a])
+        a = a.reshape(1, -1)
         if row is False:
             a = a.T
 
     if arraytype == "coords":
-        coords = ['(' + ','.join([frmt.format(x) for x in r]) + ')' for r in a]
-        return '{' + ','.join(coords) + '}'
+        return _coordschunks(a, frmt, imstring, mathform, maxpoints=maxpoints,
+                             stats=stats)
+
+    ncols = a.shape[1]
+    if edgeitems is not None and max(a.shape) > 2 * edgeitems:
+        lines = _elidedlines(a, edgeitems,
+                             _functools.partial(_numpyarraylines, frmt=frmt,
+                                                imstring=imstring,
+                                                mathform=mathform,
+                                                stats=stats))
+        ncols = min(ncols, 2 * edgeitems + 1)
+    elif _parallel(workers, *a.shape):
+        lines = _parallelnumpyarraylines(a, frmt, imstring, mathform, workers,
+                                         stats)
+    else:
+        lines = _numpyarraylines(a, frmt, imstring, mathform, stats=stats)
+
+    header, footer = _numpyarrayframe(arraytype, ncols)
+    return _chunks(header, lines, footer)
+
+
+def _coordschunks(a, frmt, imstring, mathform, maxpoints=None, stats=None):
+    """Yield the pieces of the pgfplots coordinates of the rows of `a`.
 
+    Numbers are formatted a block of rows at a time with `frmt` alone. With
+    `maxpoints`, longer arrays are thinned to `maxpoints` rows, evenly spaced
+    from the first to the last, before anything is formatted.
+
+    >>> import numpy as np
+    >>> import array_to_latex as a2l
+    >>> P = np.array([[0, 0], [1, 1], [2, 4], [3, 9], [4, 16]])
+    >>> a2l.to_ltx(P, frmt = '{}', arraytype = 'coords', maxpoints = 3,
+    ...            print_out = False)
+    '{(0,0),(2,4),(4,16)}'
+    >>> a2l.to_ltx(P, arraytype = 'coords', maxpoints = 0)
+    Traceback (most recent call last):
+        ...
+    ValueError: maxpoints must be a positive integer
+    """
+    if stats is None:
+        stats = _NO_STATS
+    if maxpoints is not None and a.shape[0] > maxpoints:
+        a = a[_np.unique(_np.linspace(0, a.shape[0] - 1, maxpoints)
+                         .round().astype(_np.intp))]
+    ncols = a.shape[1]
+    with stats.time('parse'):
+        fmt = _compile_format(frmt, mathform=mathform, imstring=imstring)
+
+    yield '{'
+    separator = '('
+    for block in _blocks(*a.shape):
+        values = a[block]
+        with stats.time('format'):
+            numbers = fmt.numbers(values)
+        with stats.time('assembly'):
+            if ncols:
+                points = list(map(','.join, zip(*[numbers[j::ncols]
+                                                  for j in range(ncols)])))
+            else:
+                points = [''] * values.shape[0]
+            piece = separator + '),('.join(points) + ')'
+        stats.count(len(points), len(numbers))
+        yield piece
+        separator = ',('
+    yield '}'
+
+
+def _numpyarrayframe(arraytype, ncols):
+    """Return the header and footer around the rows of a numpy array."""
     arrayformat = ''
 
     if arraytype == 'array':
-        arrayformat = '{'
-        for _ in _np.arange(a.shape[1]):
-            arrayformat = arrayformat + ' c,'
-        arrayformat = arrayformat[:-1] + '}'
-
-    out = r'\begin{' + arraytype + '}' + arrayformat + '\n'
-    for i in _np.arange(a.shape[0]):
-        out = out + ' '
-        for j in _np.arange(a.shape[1]):
-            if isinstance(a[i, j], str):
-                leadstr = ' '
-                dot_space = (((max(len(pet) for pet in a[:, j]) - len(a[i, j]))) * ' ')
-                out = (out + leadstr + a[i, j] + dot_space + ' & ')
-            else:
-                leadstr = '' if _np.real(a[i, j]) < 0 else ' '
-                dot_space = ' ' if '.' not in frmt.format(a[i, j]) else ''
-                if _np.iscomplexobj(a[i, j]):
-                    out = (out + leadstr
-                           + math_form(frmt.format(_np.real(a[i, j])),
-                                       mathform=mathform)
-                           + ' + '
-                           + math_form(frmt.format(_np.imag(a[i, j])),
-                                       is_imaginary=True,
-                                       mathform=mathform)
-                           + imstring
-                           + dot_space + ' & ')
-                else:
-                    out = (out
-                           + leadstr
-                           + math_form(frmt.format(_np.real(a[i, j])),
-                                       mathform=mathform)
-                           + dot_space
-                           + r' & ')
+        arrayformat = '{' + ','.join([' c'] * ncols) + '}'
+
+    return (r'\begin{' + arraytype + '}' + arrayformat + '\n',
+            '\n' + r'\end{' + arraytype + '}')
+
+
+def _edges(n, edgeitems):
+    """Return slices of the first and last `edgeitems` of `n`, or of all."""
+    if n <= 2 * edgeitems:
+        return [slice(0, n)]
+    return [slice(0, edgeitems), slice(n - edgeitems, n)]
+
+
+def _elidedlines(a, edgeitems, lines):
+    r"""Yield the first and last `edgeitems` rows of `a` as LaTeX, with dots.
+
+    Only the first and last `edgeitems` columns are shown, with dots in
+    between. `lines(block)` yields the rows of a part of `a` as LaTeX, and
+    must also take the `widths` of string columns if `a` holds strings.
+    Only the parts shown are formatted.
+
+    >>> import numpy as np
+    >>> import array_to_latex as a2l
+    >>> A = np.arange(16.).reshape(4, 4)
+    >>> print(a2l.to_ltx(A, edgeitems=1, print_out=False))
+    \begin{bmatrix}
+      0.00 &  \cdots &  3.00\\
+      \vdots &  \ddots &  \vdots\\
+      12.00 &  \cdots &  15.00
+    \end{bmatrix}
+    """
+    row_parts = _edges(a.shape[0], edgeitems)
+    column_parts = _edges(a.shape[1], edgeitems)
+    blocks = [[a[rows][:, columns] for columns in column_parts]
+              for rows in row_parts]
+    widths = [None] * len(column_parts)
+    if a.dtype.kind in 'UO':
+        # Top and bottom blocks are padded alike.
+        widths = [_string_widths(_np.concatenate([row_blocks[j]
+                                                  for row_blocks in blocks]))
+                  for j in range(len(column_parts))]
+
+    dots = []
+    for j, columns in enumerate(column_parts):
+        if j:
+            dots.append(r' \ddots')
+        dots.extend([r' \vdots'] * len(range(a.shape[1])[columns]))
+
+    for i, row_blocks in enumerate(blocks):
+        if i:
+            yield ' ' + ' & '.join(dots)
+        parts = [lines(block) if width is None else lines(block, widths=width)
+                 for block, width in zip(row_blocks, widths)]
+        for pieces in zip(*parts):
+            yield r' &  \cdots &'.join(pieces)
+
+
+def _is_sparse(a):
+    r"""Return True if `a` is a scipy.sparse matrix or array.
+
+    As with Pandas in `_is_dataframe`, scipy is never imported here. Sparse
+    matrices are converted without making them dense (skipped without
+    scipy):
+
+    >>> import pytest
+    >>> sparse = pytest.importorskip('scipy.sparse')
+    >>> import numpy as np
+    >>> import array_to_latex as a2l
+    >>> S = sparse.csr_matrix(np.array([[1.5, 0], [0, -2]]))
+    >>> a2l.to_ltx(S, print_out=False) == a2l.to_ltx(S.toarray(),
+    ...                                              print_out=False)
+    True
+    >>> print(a2l.to_ltx(S, zero='', print_out=False))
+    \begin{bmatrix}
+      1.50 &  \\
+       & -2.00
+    \end{bmatrix}
+    """
+    sparse = _sys.modules.get('scipy.sparse')
+    return sparse is not None and sparse.issparse(a)
+
+
+def _sparsecells(values, fmt, stats):
+    """Return the LaTeX cells of the stored values of a sparse matrix."""
+    if values.dtype.kind in 'fiuc':
+        return _number_cells(values, fmt, stats)
+    with stats.time('format'):
+        return [fmt.cell(x) for x in values]
+
+
+def _sparsearraylines(a, frmt, imstring, mathform, zero=None, stats=None):
+    """Yield the rows of a CSR matrix as LaTeX, without row breaks.
+
+    Only stored entries are formatted. All the others are the same cell:
+    `zero`, or a zero formatted like any other number if `zero` is None.
+    Counts and timings are added to `stats`, a `RenderStats`, if given.
+    """
+    if stats is None:
+        stats = _NO_STATS
+    ncols = a.shape[1]
+    with stats.time('parse'):
+        fmt = _compile_format(frmt, mathform=mathform, imstring=imstring)
+    if zero is None:
+        blank = _sparsecells(_np.zeros(1, dtype=a.dtype), fmt, stats)[0]
+    else:
+        blank = ' ' + zero
+
+    for block in _blocks(*a.shape):
+        part = a[block]
+        cells = _sparsecells(part.data, fmt, stats)
+        with stats.time('assembly'):
+            indptr = part.indptr.tolist()
+            indices = part.indices.tolist()
+            lines = []
+            for i in range(part.shape[0]):
+                row_cells = [blank] * ncols
+                for k in range(indptr[i], indptr[i + 1]):
+                    row_cells[indices[k]] = cells[k]
+                lines.append(' ' + ' & '.join(row_cells))
+        stats.count(len(lines), len(lines) * ncols)
+        yield from lines
+
+
+def _sparsechunks(a, frmt='{:6.2f}', arraytype='bmatrix', imstring='j',
+                  row=True, mathform=True, edgeitems=None, zero=None,
+                  maxpoints=None, stats=None):
+    """Return an iterator over the pieces of the LaTeX for a sparse matrix.
+
+    The matrix is never made dense: only its stored entries are formatted.
+    """
+    if edgeitems is not None and edgeitems < 1:
+        raise ValueError('edgeitems must be a positive integer')
+    if maxpoints is not None and maxpoints < 1:
+        raise ValueError('maxpoints must be a positive integer')
+    if len(a.shape) > 2:
+        raise ValueError('bmatrix can at most display two dimensions')
 
-        out = out[:-3]
-        out = out + '\\\\\n'
+    if len(a.shape) == 1:
+        a = a.reshape((1, a.shape[0]))
+        if row is False:
+            a = a.T
+
+    if arraytype == "coords":
+        # Points have only a few coordinates each.
+        return _coordschunks(a.toarray(), frmt, imstring, mathform,
+                             maxpoints=maxpoints, stats=stats)
+
+    a = a.tocsr()
+    if not a.has_canonical_format:
+        a = a.copy()
+        a.sum_duplicates()
 
-    out = out[:-3] + '\n' + r'\end{' + arraytype + '}'
+    lines = _functools.partial(_sparsearraylines, frmt=frmt,
+                               imstring=imstring, mathform=mathform,
+                               zero=zero, stats=stats)
+    ncols = a.shape[1]
+    if edgeitems is not None and max(a.shape) > 2 * edgeitems:
+        lines = _elidedlines(a, edgeitems, lines)
+        ncols = min(ncols, 2 * edgeitems + 1)
+    else:
+        lines = lines(a)
 
-    return out
+    header, footer = _numpyarrayframe(arraytype, ncols)
+    return _chunks(header, lines, footer)
 
 
 def _dataframetolatex(df,
@@ -235,68 +809,325 @@ def _dataframetolatex(df,
     None
 
     """
+    return ''.join(_dataframechunks(df, frmt=frmt, arraytype=arraytype,
+                                    imstring=imstring, mathform=mathform))
+
+
+def _dataframewidths(df):
+    """Return the longest string length of each DataFrame column holding any.
+
+    The result maps column positions to widths.
+    """
+    widths = {}
+    for j in range(df.shape[1]):
+        column = df.iloc[:, j]
+        if column.dtype.kind in 'biufc':
+            continue
+        lengths = [len(pet) for pet in column if isinstance(pet, str)]
+        if lengths:
+            widths[j] = max(lengths)
+    return widths
+
+
+def _dataframelines(df, frmt, imstring, mathform, widths=None, stats=None):
+    """Yield the rows of a DataFrame as LaTeX, without row breaks.
+
+    Each column is formatted in its own dtype, a block of rows at a time, so
+    the frame is never copied as a whole. `widths` are the string column
+    widths of the whole frame when `df` is only a block of its rows. Counts
+    and timings are added to `stats`, a `RenderStats`, if given.
+    """
+    if stats is None:
+        stats = _NO_STATS
+    if widths is None:
+        with stats.time('pad'):
+            widths = _dataframewidths(df)
+    with stats.time('parse'):
+        fmt = _compile_format(frmt, mathform=mathform, imstring=imstring)
+    for block in _blocks(*df.shape):
+        chunk = df.iloc[block]
+        columns = []
+        for j in range(chunk.shape[1]):
+            values = chunk.iloc[:, j].to_numpy()
+            if values.dtype.kind in 'fiuc':
+                columns.append(_number_cells(values, fmt, stats))
+                continue
+
+            with stats.time('format'):
+                cells = []
+                for x in values:
+                    if isinstance(x, str):
+                        leadstr = ' '
+                        dot_space = (widths[j] - len(x)) * ' '
+                        cells.append(leadstr + x + dot_space)
+                    else:
+                        cells.append(fmt.cell(x))
+            columns.append(cells)
+
+        with stats.time('assembly'):
+            lines = [' & '.join([' ' + str(label)] + cells)
+                     for label, *cells in zip(chunk.index, *columns)]
+        stats.count(len(lines), len(lines) * chunk.shape[1])
+        yield from lines
+
+
+def _dataframechunks(df, frmt='{:6.2f}', arraytype='tabular', imstring='j',
+                     mathform=True, workers=None, stats=None):
+    """Return an iterator over the pieces of the LaTeX for a DataFrame."""
     columns = df.columns
-    rows = df.transpose().columns
-    a = _np.array(df)
-    out = r'\begin{' + arraytype + '}'
+    if _parallel(workers, *df.shape):
+        lines = _paralleldataframelines(df, frmt, imstring, mathform, workers,
+                                        stats)
+    else:
+        lines = _dataframelines(df, frmt, imstring, mathform, stats=stats)
+    header = [r'\begin{' + arraytype + '}']
 
     if arraytype == 'tabular':
-        out += r'{l'
-        for _ in columns:
-            out += 'r'
-        out += r'}'
+        header.append(r'{l' + 'r' * len(columns) + r'}')
 
-    out += '\n'
+    header.append('\n')
 
     if arraytype == 'tabular':
-        out += '\\toprule\n'
-
-        out += '     '
-        for column in columns:
-            out += '& ' + column + ' '
-        out += r'\\\n'
-
-        out += '\\midrule\n'
-
-    for i in _np.arange(a.shape[0]):
-        out = out + ' ' + str(rows[i]) + ' & '
-        for j in _np.arange(a.shape[1]):
-            if isinstance(a[i, j], str):
-                leadstr = ' '
-                dot_space = (((max(len(pet) for pet in a[:, j]) - len(a[i, j]))) * ' ')
-                out = (out + leadstr + a[i, j] + dot_space + ' & ')
-            else:
-                leadstr = '' if _np.real(a[i, j]) < 0 else ' '
-                dot_space = ' ' if '.' not in frmt.format(a[i, j]) else ''
-                if _np.iscomplexobj(a[i, j]):
-                    out = (out + leadstr
-                           + math_form(frmt.format(_np.real(a[i, j])),
-                                       mathform=mathform)
-                           + ' + '
-                           + math_form(frmt.format(_np.imag(a[i, j])),
-                                       is_imaginary=True,
-                                       mathform=mathform)
-                           + imstring
-                           + dot_space + ' & ')
-                else:
-                    out = (out + leadstr
-                           + math_form(frmt.format(a[i, j]),
-                                       mathform=mathform)
-                           + dot_space + ' & ')
+        header.append('\\toprule\n')
 
-        out = out[:-3]
-        out += '\\\\\n'
+        header.append('     ')
+        header.extend(['& ' + column + ' ' for column in columns])
+        header.append(r'\\\n')
+
+        header.append('\\midrule\n')
+
+        return _chunks(''.join(header),
+                       lines,
+                       '\\bottomrule\n' + r'\end{' + arraytype + '}',
+                       terminated=True)
+
+    return _chunks(''.join(header),
+                   lines,
+                   '\n' + r'\end{' + arraytype + '}')
+
+
+def _parallel(workers, nrows, ncols):
+    """Return True if `workers` processes should share an nrows x ncols job.
+
+    Arrays that fit in a single block are always rendered serially. The
+    output is the same either way:
+
+    >>> import numpy as np
+    >>> import array_to_latex as a2l
+    >>> big = np.arange(300 * 300.).reshape(300, 300) / 7
+    >>> stats = a2l.RenderStats()
+    >>> parallel = a2l.to_ltx(big, print_out=False, workers=2, stats=stats)
+    >>> parallel == a2l.to_ltx(big, print_out=False), stats.times['workers'] > 0
+    (True, True)
+    """
+    return (workers is not None and workers > 1
+            and nrows * ncols > _BLOCK_CELLS)
+
+
+def _collectlines(lines, *args):
+    """Return the rows yielded by `lines(*args)` as a list.
+
+    Run in a worker process; generators cannot be sent back from one.
+    """
+    return list(lines(*args))
+
+
+def _sharedarraylines(name, shape, dtype, block, frmt, imstring, mathform,
+                      widths):
+    """Return the rows of `block` of an array held in shared memory `name`.
+
+    Run in a worker process by `_parallelnumpyarraylines`.
+    """
+    from multiprocessing import shared_memory as _shared_memory
+
+    shm = _shared_memory.SharedMemory(name=name)
+    a = _np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+    try:
+        return list(_numpyarraylines(a[block], frmt, imstring, mathform,
+                                     widths))
+    finally:
+        del a
+        shm.close()
+
+
+def _parallellines(tasks, workers, ncols, stats=None):
+    """Yield the rows produced by `tasks` in a pool of `workers` processes.
+
+    `tasks` yields `(function, args)` pairs, each returning a list of rows
+    of `ncols` cells. Rows come back in task order, and at most two tasks
+    per worker are in flight so that output can be consumed as it is
+    produced. Time spent waiting for the workers is added to `stats`.
+    """
+    import concurrent.futures as _futures
+
+    if stats is None:
+        stats = _NO_STATS
+    with _futures.ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = _collections.deque()
+        for function, args in tasks:
+            pending.append(executor.submit(function, *args))
+            if len(pending) >= 2 * workers:
+                with stats.time('workers'):
+                    lines = pending.popleft().result()
+                stats.count(len(lines), len(lines) * ncols)
+                yield from lines
+        while pending:
+            with stats.time('workers'):
+                lines = pending.popleft().result()
+            stats.count(len(lines), len(lines) * ncols)
+            yield from lines
+
+
+def _parallelnumpyarraylines(a, frmt, imstring, mathform, workers, stats=None):
+    """Yield the rows of a 2-D numpy array, formatted by `workers` processes.
+
+    Arrays without Python objects are copied once into shared memory and
+    each worker reads its own blocks of rows from there; object arrays are
+    sent a block at a time.
+    """
+    widths = _string_widths(a)
+    if a.dtype.hasobject:
+        yield from _parallellines(
+            ((_collectlines,
+              (_numpyarraylines, a[block], frmt, imstring, mathform, widths))
+             for block in _blocks(*a.shape)),
+            workers, a.shape[1], stats)
+        return
+
+    from multiprocessing import shared_memory as _shared_memory
+
+    shm = _shared_memory.SharedMemory(create=True, size=max(a.nbytes, 1))
+    try:
+        shared = _np.ndarray(a.shape, dtype=a.dtype, buffer=shm.buf)
+        shared[...] = a
+        del shared
+        yield from _parallellines(
+            ((_sharedarraylines,
+              (shm.name, a.shape, a.dtype, block, frmt, imstring, mathform,
+               widths))
+             for block in _blocks(*a.shape)),
+            workers, a.shape[1], stats)
+    finally:
+        shm.close()
+        shm.unlink()
+
+
+def _paralleldataframelines(df, frmt, imstring, mathform, workers,
+                            stats=None):
+    """Yield the rows of a DataFrame, formatted by `workers` processes.
+
+    Each worker is sent one block of rows, keeping the column dtypes.
+    """
+    widths = _dataframewidths(df)
+    yield from _parallellines(
+        ((_collectlines,
+          (_dataframelines, df.iloc[block], frmt, imstring, mathform, widths))
+         for block in _blocks(*df.shape)),
+        workers, df.shape[1], stats)
+
+
+def _is_dataframe(a):
+    """Return True if `a` is a Pandas DataFrame.
+
+    Pandas is not imported here (or anywhere in this module): if it has
+    not been imported yet, `a` cannot be a DataFrame. This keeps `import
+    array_to_latex` fast for code that only uses numpy.
+
+    >>> import os, subprocess, sys
+    >>> import array_to_latex as a2l
+    >>> code = 'import sys, array_to_latex; print("pandas" in sys.modules)'
+    >>> root = os.path.dirname(os.path.dirname(os.path.abspath(a2l.__file__)))
+    >>> print(subprocess.check_output([sys.executable, '-c', code], cwd=root,
+    ...                               universal_newlines=True).strip())
+    False
+    """
+    pandas = _sys.modules.get('pandas')
+    return pandas is not None and isinstance(a, pandas.DataFrame)
+
+
+def _latexstring(a, frmt, arraytype, imstring, row, mathform, edgeitems=None,
+                 zero=None, maxpoints=None, workers=None, stats=None,
+                 cache=None):
+    """Return the LaTeX for `a` as a string, from `cache` if it is there."""
+    key = None
+    if cache is not None:
+        # The version is part of the key so that files kept on disk by an
+        # older release are not returned.
+        key = _cachekey(a, (__version__, frmt, arraytype, imstring, row,
+                            mathform, edgeitems, zero, maxpoints))
+    if key is not None:
+        latex = cache.get(key)
+        if latex is not None:
+            # Nothing is rendered, but the array still counts as converted.
+            if stats is not None:
+                stats.calls += 1
+                stats.chars += len(latex)
+            return latex
+    latex = ''.join(_latexchunks(a, frmt=frmt, arraytype=arraytype,
+                                 imstring=imstring, row=row,
+                                 mathform=mathform, edgeitems=edgeitems,
+                                 zero=zero, maxpoints=maxpoints,
+                                 workers=workers, stats=stats))
+    if key is not None:
+        cache.put(key, latex)
+    return latex
+
+
+def _latexchunks(a, frmt, arraytype, imstring, row, mathform, edgeitems=None,
+                 zero=None, maxpoints=None, workers=None, stats=None):
+    """Return an iterator over the pieces of the LaTeX for `a`.
+
+    Raises TypeError straight away if `a` is not a numpy array, sparse
+    matrix or DataFrame.
+    """
+    if isinstance(a, _np.ndarray):
+
+        if arraytype is None:
+            arraytype = 'bmatrix'
+        chunks = _numpyarraychunks(a, frmt=frmt, arraytype=arraytype,
+                                   imstring=imstring, row=row,
+                                   mathform=mathform, edgeitems=edgeitems,
+                                   maxpoints=maxpoints, workers=workers,
+                                   stats=stats)
+
+    elif _is_sparse(a):
+
+        if arraytype is None:
+            arraytype = 'bmatrix'
+        chunks = _sparsechunks(a, frmt=frmt, arraytype=arraytype,
+                               imstring=imstring, row=row, mathform=mathform,
+                               edgeitems=edgeitems, zero=zero,
+                               maxpoints=maxpoints, stats=stats)
+
+    elif _is_dataframe(a):
+
+        if arraytype is None:
+            arraytype = 'tabular'
+        chunks = _dataframechunks(a, frmt=frmt, arraytype=arraytype,
+                                  imstring=imstring, workers=workers,
+                                  stats=stats)
 
-    if arraytype == 'tabular':
-        out += '\\bottomrule\n'
-        out += r'\end{' + arraytype + '}'
     else:
-        out = out[:-3] + '\n' + r'\end{' + arraytype + '}'
+        raise TypeError("Argument should be a numpy array, "
+                        "a scipy.sparse matrix or a pandas DataFrame.")
+
+    if stats is None:
+        return chunks
+    stats.calls += 1
+    return _counted(chunks, stats)
+
+
+def _counted(chunks, stats):
+    """Yield `chunks`, adding the characters in them to `stats.chars`."""
+    for piece in chunks:
+        stats.chars += len(piece)
+        yield piece
 
-    return out
 
 def to_ltx(a, frmt='{:1.2f}', arraytype=None, nargout=0,
-           imstring='j', row=True, mathform=True, print_out=True):
+           imstring='j', row=True, mathform=True, print_out=True,
+           edgeitems=None, zero=None, maxpoints=None, workers=None,
+           stats=None, cache=None):
     r"""
     Print or return a LaTeX array given a numpy array or Pandas dataframe.
 
@@ -315,7 +1146,26 @@ def to_ltx(a, frmt='{:1.2f}', arraytype=None, nargout=0,
             a row (True) or column (False)
     mathform  : Boolean (optional: default True)
         Replace #E# with #\times10^{#}
-
+    edgeitems : int (optional: default None)
+        Show only the first and last `edgeitems` rows and columns of a
+        bigger numpy array or sparse matrix, with dots for the rest
+    zero      : string (optional: default None)
+        Written in place of the entries a sparse matrix does not store.
+        By default they are formatted like any other zero.
+    maxpoints : int (optional: default None)
+        With `arraytype` ``coords``, write at most `maxpoints` points,
+        evenly spaced from the first to the last
+    workers   : int (optional: default None)
+        Number of processes formatting blocks of rows in parallel. The
+        output is the same as without them. Small arrays are always
+        formatted in this process. Numeric and string arrays are first
+        copied whole into shared memory, so a memory-mapped array is read
+        into memory at once instead of a block of rows at a time.
+    stats     : RenderStats (optional: default None)
+        Add counts and per-phase timings of this conversion to `stats`.
+    cache     : LatexCache (optional: default None)
+        Look the array up in `cache` before converting it, and keep the
+        result there
 
     Returns
     -------
@@ -324,7 +1174,7 @@ def to_ltx(a, frmt='{:1.2f}', arraytype=None, nargout=0,
 
     See Also
     --------
-    to_clp
+    to_clp, LatexCache
 
     Examples
     --------
@@ -354,23 +1204,10 @@ def to_ltx(a, frmt='{:1.2f}', arraytype=None, nargout=0,
     None
 
     """
-    if isinstance(a, _np.ndarray):
-
-        if arraytype is None:
-            arraytype = 'bmatrix'
-        latex = _numpyarraytolatex(a, frmt=frmt, arraytype=arraytype,
-                                   nargout=nargout, imstring=imstring,
-                                   row=row, mathform=mathform)
-
-    elif isinstance(a, _pd.core.frame.DataFrame):
-
-        if arraytype is None:
-            arraytype = 'tabular'
-        latex = _dataframetolatex(a, frmt=frmt, arraytype=arraytype,
-                                  nargout=nargout, imstring=imstring)
-    else:
-        raise TypeError("Argument should be a "
-                        "numpy array or a pandas DataFrame.")
+    latex = _latexstring(a, frmt=frmt, arraytype=arraytype,
+                         imstring=imstring, row=row, mathform=mathform,
+                         edgeitems=edgeitems, zero=zero, maxpoints=maxpoints,
+                         workers=workers, stats=stats, cache=cache)
     if print_out is True:
         print(latex)
         return
@@ -378,6 +1215,755 @@ def to_ltx(a, frmt='{:1.2f}', arraytype=None, nargout=0,
     return latex
 
 
+def to_ltx_stream(a, frmt='{:1.2f}', arraytype=None, imstring='j', row=True,
+                  mathform=True, edgeitems=None, zero=None, maxpoints=None,
+                  workers=None, stats=None):
+    r"""
+    Yield a LaTeX array given a numpy array or Pandas dataframe, in pieces.
+
+    The pieces are the opening ``\begin{...}`` line, each row and the closing
+    ``\end{...}`` (for ``coords``, the braces and blocks of points). Joined,
+    they are exactly what `to_ltx` returns, but rows are formatted only as
+    they are consumed, so memory use does not grow with the size of `a`.
+    Memory-mapped arrays (``np.load(..., mmap_mode='r')``) are read a block
+    of rows at a time.
+
+    Parameters
+    ----------
+    a         : float array
+    frmt      : string
+        python 3 formatter, optional-
+        https://mkaz.tech/python-string-format.html
+    arraytype : string
+        latex array type- `bmatrix` default, optional
+    imstring : string (optional)
+        Character for square root of -1. Usually i or j
+    row        : Boolean (optional: default True)
+        If the array is 1-D, should the output be
+            a row (True) or column (False)
+    mathform  : Boolean (optional: default True)
+        Replace #E# with #\times10^{#}
+    edgeitems : int (optional: default None)
+        Show only the first and last `edgeitems` rows and columns of a
+        bigger numpy array or sparse matrix, with dots for the rest
+    zero      : string (optional: default None)
+        Written in place of the entries a sparse matrix does not store.
+        By default they are formatted like any other zero.
+    maxpoints : int (optional: default None)
+        With `arraytype` ``coords``, write at most `maxpoints` points,
+        evenly spaced from the first to the last
+    workers   : int (optional: default None)
+        Number of processes formatting blocks of rows in parallel. The
+        output is the same as without them. Small arrays are always
+        formatted in this process. Numeric and string arrays are first
+        copied whole into shared memory, so a memory-mapped array is read
+        into memory at once instead of a block of rows at a time.
+    stats     : RenderStats (optional: default None)
+        Add counts and per-phase timings of this conversion to `stats`.
+
+    Returns
+    -------
+    out: iterator of str
+        Pieces of the LaTeX array
+
+    See Also
+    --------
+    to_ltx, write_ltx
+
+    Examples
+    --------
+    >>> import numpy as np
+    >>> import array_to_latex as a2l
+    >>> A = np.array([[1.23456, 23.45678],[456.23, 8.239521]])
+    >>> for piece in a2l.to_ltx_stream(A, frmt = '{:6.2f}'):
+    ...     print(repr(piece))
+    '\\begin{bmatrix}\n'
+    '    1.23 &   23.46'
+    '\\\\\n  456.23 &    8.24'
+    '\n\\end{bmatrix}'
+
+    """
+    return _latexchunks(a, frmt=frmt, arraytype=arraytype, imstring=imstring,
+                        row=row, mathform=mathform, edgeitems=edgeitems,
+                        zero=zero, maxpoints=maxpoints, workers=workers,
+                        stats=stats)
+
+
+def write_ltx(a, fileobj, frmt='{:1.2f}', arraytype=None, imstring='j',
+              row=True, mathform=True, edgeitems=None, zero=None,
+              maxpoints=None, workers=None, stats=None):
+    r"""
+    Write a LaTeX array given a numpy array or Pandas dataframe to a file.
+
+    The LaTeX is written piece by piece as it is produced (see
+    `to_ltx_stream`), so it is never held in memory as a whole.
+
+    Parameters
+    ----------
+    a         : float array
+    fileobj   : file-like object
+        Open text file, or anything else with a `write` method
+    frmt      : string
+        python 3 formatter, optional-
+        https://mkaz.tech/python-string-format.html
+    arraytype : string
+        latex array type- `bmatrix` default, optional
+    imstring : string (optional)
+        Character for square root of -1. Usually i or j
+    row        : Boolean (optional: default True)
+        If the array is 1-D, should the output be
+            a row (True) or column (False)
+    mathform  : Boolean (optional: default True)
+        Replace #E# with #\times10^{#}
+    edgeitems : int (optional: default None)
+        Show only the first and last `edgeitems` rows and columns of a
+        bigger numpy array or sparse matrix, with dots for the rest
+    zero      : string (optional: default None)
+        Written in place of the entries a sparse matrix does not store.
+        By default they are formatted like any other zero.
+    maxpoints : int (optional: default None)
+        With `arraytype` ``coords``, write at most `maxpoints` points,
+        evenly spaced from the first to the last
+    workers   : int (optional: default None)
+        Number of processes formatting blocks of rows in parallel. The
+        output is the same as without them. Small arrays are always
+        formatted in this process. Numeric and string arrays are first
+        copied whole into shared memory, so a memory-mapped array is read
+        into memory at once instead of a block of rows at a time.
+    stats     : RenderStats (optional: default None)
+        Add counts and per-phase timings of this conversion to `stats`.
+
+    See Also
+    --------
+    to_ltx, to_ltx_stream
+
+    Examples
+    --------
+    >>> import io
+    >>> import numpy as np
+    >>> import array_to_latex as a2l
+    >>> A = np.array([[1.23456, 23.45678],[456.23, 8.239521]])
+    >>> f = io.StringIO()
+    >>> a2l.write_ltx(A, f, frmt = '{:6.2f}', arraytype = 'array')
+    >>> print(f.getvalue())
+    \begin{array}{ c, c}
+        1.23 &   23.46\\
+      456.23 &    8.24
+    \end{array}
+
+    """
+    for piece in to_ltx_stream(a, frmt=frmt, arraytype=arraytype,
+                               imstring=imstring, row=row, mathform=mathform,
+                               edgeitems=edgeitems, zero=zero,
+                               maxpoints=maxpoints, workers=workers,
+                               stats=stats):
+        fileobj.write(piece)
+
+
+class LatexFormatter(object):
+    r"""
+    Convert numpy arrays and Pandas dataframes to LaTeX with fixed options.
+
+    The options are checked once, when the formatter is made, and reused for
+    every array it converts. Use it in place of repeated calls to `to_ltx`
+    with the same arguments.
+
+    Parameters
+    ----------
+    frmt      : string
+        python 3 formatter, optional-
+        https://mkaz.tech/python-string-format.html
+    arraytype : string
+        latex array type- `bmatrix` default, optional
+    imstring : string (optional)
+        Character for square root of -1. Usually i or j
+    row        : Boolean (optional: default True)
+        If the array is 1-D, should the output be
+            a row (True) or column (False)
+    mathform  : Boolean (optional: default True)
+        Replace #E# with #\times10^{#}
+    edgeitems : int (optional: default None)
+        Show only the first and last `edgeitems` rows and columns of a
+        bigger numpy array or sparse matrix, with dots for the rest
+    zero      : string (optional: default None)
+        Written in place of the entries a sparse matrix does not store.
+        By default they are formatted like any other zero.
+    maxpoints : int (optional: default None)
+        With `arraytype` ``coords``, write at most `maxpoints` points,
+        evenly spaced from the first to the last
+    cache     : LatexCache (optional: default None)
+        Look arrays up in `cache` before converting them, and keep the
+        results there
+
+    See Also
+    --------
+    to_ltx, to_ltx_many, LatexCache
+
+    Examples
+    --------
+    >>> import numpy as np
+    >>> import array_to_latex as a2l
+    >>> to_tex = a2l.LatexFormatter(frmt = '{:6.2f}', arraytype = 'array')
+    >>> print(to_tex(np.array([[1.23456, 23.45678],[456.23, 8.239521]])))
+    \begin{array}{ c, c}
+        1.23 &   23.46\\
+      456.23 &    8.24
+    \end{array}
+    >>> to_tex.many([np.array([1.5, 2]), np.array([-3.25])])
+    ['\\begin{array}{ c, c}\n   1.50 &    2.00\n\\end{array}', '\\begin{array}{ c}\n  -3.25\n\\end{array}']
+
+    """
+
+    def __init__(self, frmt='{:1.2f}', arraytype=None, imstring='j', row=True,
+                 mathform=True, edgeitems=None, zero=None, maxpoints=None,
+                 cache=None):
+        # Raises ValueError now rather than on the first array.
+        list(_string.Formatter().parse(frmt))
+        _compile_format(frmt, mathform=mathform, imstring=imstring)
+        self.frmt = frmt
+        self.arraytype = arraytype
+        self.imstring = imstring
+        self.row = row
+        self.mathform = mathform
+        self.edgeitems = edgeitems
+        self.zero = zero
+        self.maxpoints = maxpoints
+        self.cache = cache
+
+    def __call__(self, a, workers=None, stats=None):
+        """Return the LaTeX for `a` as a string. See `to_ltx`."""
+        return _latexstring(a, frmt=self.frmt, arraytype=self.arraytype,
+                            imstring=self.imstring, row=self.row,
+                            mathform=self.mathform, edgeitems=self.edgeitems,
+                            zero=self.zero, maxpoints=self.maxpoints,
+                            workers=workers, stats=stats, cache=self.cache)
+
+    def stream(self, a, workers=None, stats=None):
+        """Return an iterator over the pieces of the LaTeX for `a`.
+
+        See `to_ltx_stream`.
+        """
+        return _latexchunks(a, frmt=self.frmt, arraytype=self.arraytype,
+                            imstring=self.imstring, row=self.row,
+                            mathform=self.mathform, edgeitems=self.edgeitems,
+                            zero=self.zero, maxpoints=self.maxpoints,
+                            workers=workers, stats=stats)
+
+    def write(self, a, fileobj, workers=None, stats=None):
+        """Write the LaTeX for `a` to `fileobj`. See `write_ltx`."""
+        for piece in self.stream(a, workers=workers, stats=stats):
+            fileobj.write(piece)
+
+    def many(self, arrays, workers=None, fileobj=None):
+        """Convert each of `arrays`. See `to_ltx_many`."""
+        if workers is not None and workers > 1:
+            import concurrent.futures as _futures
+
+            arrays = list(arrays)
+            with _futures.ProcessPoolExecutor(max_workers=workers) as executor:
+                chunksize = max(1, len(arrays) // (4 * workers))
+                latex = executor.map(self, arrays, chunksize=chunksize)
+                return _collectmany(latex, fileobj)
+
+        return _collectmany(map(self, arrays), fileobj)
+
+
+def _collectmany(latex, fileobj):
+    """Return the strings in `latex` as a list, or write them to `fileobj`.
+
+    Written arrays are separated by blank lines.
+    """
+    if fileobj is None:
+        return list(latex)
+    for i, text in enumerate(latex):
+        if i:
+            fileobj.write('\n\n')
+        fileobj.write(text)
+    fileobj.write('\n')
+
+
+def to_ltx_many(arrays, frmt='{:1.2f}', arraytype=None, imstring='j',
+                row=True, mathform=True, edgeitems=None, zero=None,
+                maxpoints=None, workers=None, fileobj=None, cache=None):
+    r"""
+    Return or write LaTeX arrays given many numpy arrays or Pandas dataframes.
+
+    Every array is converted with the same options, which are checked only
+    once. Faster than calling `to_ltx` for each of many small arrays.
+
+    Parameters
+    ----------
+    arrays    : iterable of float arrays
+    frmt      : string
+        python 3 formatter, optional-
+        https://mkaz.tech/python-string-format.html
+    arraytype : string
+        latex array type- `bmatrix` default, optional
+    imstring : string (optional)
+        Character for square root of -1. Usually i or j
+    row        : Boolean (optional: default True)
+        If the array is 1-D, should the output be
+            a row (True) or column (False)
+    mathform  : Boolean (optional: default True)
+        Replace #E# with #\times10^{#}
+    edgeitems : int (optional: default None)
+        Show only the first and last `edgeitems` rows and columns of a
+        bigger numpy array or sparse matrix, with dots for the rest
+    zero      : string (optional: default None)
+        Written in place of the entries a sparse matrix does not store.
+        By default they are formatted like any other zero.
+    maxpoints : int (optional: default None)
+        With `arraytype` ``coords``, write at most `maxpoints` points,
+        evenly spaced from the first to the last
+    workers   : int (optional: default None)
+        Number of processes converting the arrays in parallel. The output
+        is the same as without them.
+    fileobj   : file-like object (optional: default None)
+        Write all arrays to this open text file, separated by blank lines,
+        instead of returning them
+    cache     : LatexCache (optional: default None)
+        Look arrays up in `cache` before converting them, and keep the
+        results there. With `workers`, only results kept in the cache's
+        `directory` are shared with the workers.
+
+    Returns
+    -------
+    out: list of str
+        LaTeX arrays, in the order of `arrays`, or None if `fileobj` is given
+
+    See Also
+    --------
+    to_ltx, LatexFormatter
+
+    Examples
+    --------
+    >>> import numpy as np
+    >>> import array_to_latex as a2l
+    >>> A = np.array([[1.23456, 23.45678],[456.23, 8.239521]])
+    >>> for latex in a2l.to_ltx_many([A, -A], frmt = '{:6.2f}'):
+    ...     print(latex)
+    \begin{bmatrix}
+        1.23 &   23.46\\
+      456.23 &    8.24
+    \end{bmatrix}
+    \begin{bmatrix}
+       -1.23 &  -23.46\\
+     -456.23 &   -8.24
+    \end{bmatrix}
+
+    """
+    formatter = LatexFormatter(frmt=frmt, arraytype=arraytype,
+                               imstring=imstring, row=row, mathform=mathform,
+                               edgeitems=edgeitems, zero=zero,
+                               maxpoints=maxpoints, cache=cache)
+    return formatter.many(arrays, workers=workers, fileobj=fileobj)
+
+
+class IncrementalLatex(object):
+    r"""
+    Convert a numpy array to LaTeX again and again as a few of its rows change.
+
+    The LaTeX of each row is kept from one call of `update` to the next, and
+    only the rows that changed are formatted again. Use it to print the
+    same matrix at every iteration of a solver.
+
+    Parameters
+    ----------
+    frmt      : string
+        python 3 formatter, optional-
+        https://mkaz.tech/python-string-format.html
+    arraytype : string
+        latex array type- `bmatrix` default, optional
+    imstring : string (optional)
+        Character for square root of -1. Usually i or j
+    row        : Boolean (optional: default True)
+        If the array is 1-D, should the output be
+            a row (True) or column (False)
+    mathform  : Boolean (optional: default True)
+        Replace #E# with #\times10^{#}
+
+    See Also
+    --------
+    to_ltx, LatexFormatter
+
+    Examples
+    --------
+    >>> import numpy as np
+    >>> import array_to_latex as a2l
+    >>> A = np.array([[1.23456, 23.45678],[456.23, 8.239521]])
+    >>> snapshots = a2l.IncrementalLatex(frmt = '{:6.2f}')
+    >>> print(snapshots.update(A))
+    \begin{bmatrix}
+        1.23 &   23.46\\
+      456.23 &    8.24
+    \end{bmatrix}
+    >>> A[1, 1] = -1
+    >>> stats = a2l.RenderStats()
+    >>> print(snapshots.update(A, stats=stats))
+    \begin{bmatrix}
+        1.23 &   23.46\\
+      456.23 &   -1.00
+    \end{bmatrix}
+    >>> stats.rows
+    1
+    >>> latex = snapshots.update(A, rows=[], stats=stats)
+    >>> stats.rows
+    1
+
+    """
+
+    def __init__(self, frmt='{:1.2f}', arraytype=None, imstring='j', row=True,
+                 mathform=True):
+        # Raises ValueError now rather than on the first array.
+        list(_string.Formatter().parse(frmt))
+        _compile_format(frmt, mathform=mathform, imstring=imstring)
+        self.frmt = frmt
+        self.arraytype = 'bmatrix' if arraytype is None else arraytype
+        self.imstring = imstring
+        self.row = row
+        self.mathform = mathform
+        self._last = None
+        self._widths = None
+        self._lines = []
+
+    def update(self, a, rows=None, stats=None):
+        """Return the LaTeX for `a`, formatting only the rows that changed.
+
+        Parameters
+        ----------
+        a     : numpy array
+            Rows are reused only if `a` has the shape and dtype of the
+            array of the last call, and for string arrays, the same column
+            widths.
+        rows  : array_like (optional: default None)
+            Boolean mask or indices of the rows of `a` that changed since
+            the last call. By default, changed rows are found by comparing
+            `a` with a copy of the array of the last call (every row of an
+            array of Python objects is taken to have changed).
+        stats : RenderStats (optional: default None)
+            Add counts and per-phase timings of this update to `stats`.
+
+        Returns
+        -------
+        out: str
+            LaTeX array
+        """
+        if not isinstance(a, _np.ndarray):
+            raise TypeError("Argument should be a numpy array.")
+        a = _np.asarray(a)
+        if self.arraytype == 'coords':
+            # A single line: nothing to reuse.
+            return ''.join(_latexchunks(a, frmt=self.frmt,
+                                        arraytype=self.arraytype,
+                                        imstring=self.imstring, row=self.row,
+                                        mathform=self.mathform, stats=stats))
+        if len(a.shape) > 2:
+            raise ValueError('bmatrix can at most display two dimensions')
+        if len(a.shape) == 1:
+            rows = None
+            a = a.reshape(1, -1)
+            if self.row is False:
+                a = a.T
+        if stats is None:
+            stats = _NO_STATS
+
+        widths = None
+        if a.dtype.kind in 'UO':
+            with stats.time('pad'):
+                widths = _string_widths(a)
+
+        last = self._last
+        nrows = a.shape[0]
+        if (last is None or last.shape != a.shape or last.dtype != a.dtype
+                or widths != self._widths):
+            changed = _np.arange(nrows)
+            self._lines = [None] * nrows
+        elif rows is not None:
+            rows = _np.asarray(rows)
+            if rows.dtype != bool:
+                # An empty list (nothing changed) would be float otherwise.
+                rows = rows.astype(_np.intp)
+            changed = _np.unique(_np.arange(nrows)[rows])
+        elif a.dtype.hasobject:
+            changed = _np.arange(nrows)
+        else:
+            # Compared bit for bit, so NaNs and signed zeros count too.
+            new = _np.ascontiguousarray(a).view(_np.uint8)
+            changed = _np.flatnonzero((new != last.view(_np.uint8)).any(axis=1))
+
+        if len(changed):
+            block = a if len(changed) == nrows else a[changed]
+            lines = _numpyarraylines(block, self.frmt, self.imstring,
+                                     self.mathform, widths=widths, stats=stats)
+            for i, line in zip(changed.tolist(), lines):
+                self._lines[i] = line
+        self._last = a.copy()
+        self._widths = widths
+
+        header, footer = _numpyarrayframe(self.arraytype, a.shape[1])
+        with stats.time('assembly'):
+            latex = ''.join(_chunks(header, self._lines, footer))
+        if stats is not _NO_STATS:
+            stats.calls += 1
+            stats.chars += len(latex)
+        return latex
+
+
+class RenderStats(object):
+    r"""
+    Counts and timings gathered while converting arrays to LaTeX.
+
+    Pass one as `stats` to `to_ltx`, `to_ltx_stream`, `write_ltx` or a
+    `LatexFormatter` to find out where the time goes. Counts and timings
+    add up over every conversion it is passed to. Without `stats`, nothing
+    is measured.
+
+    Attributes
+    ----------
+    calls : int
+        Number of arrays converted, including those found in a `cache`
+    rows  : int
+        Number of rows rendered (arrays found in a `cache` add none)
+    cells : int
+        Number of cells rendered (arrays found in a `cache` add none)
+    chars : int
+        Number of characters of LaTeX produced (bytes, for ASCII output)
+    times : dict
+        Seconds spent in each phase:
+
+        ``parse``: compiling the format string;
+        ``format``: formatting numbers, and whole cells of object arrays or
+        for format strings without a fast path;
+        ``latex``: signs, exponents and decimal-point padding of numbers;
+        ``pad``: measuring and padding string columns;
+        ``assembly``: joining cells into rows;
+        ``workers``: waiting for worker processes (with `workers`).
+
+    Examples
+    --------
+    >>> import numpy as np
+    >>> import array_to_latex as a2l
+    >>> A = np.array([[1.23456, 23.45678],[456.23, 8.239521]])
+    >>> stats = a2l.RenderStats()
+    >>> latex = a2l.to_ltx(A, print_out=False, stats=stats)
+    >>> stats.calls, stats.rows, stats.cells, stats.chars == len(latex)
+    (1, 2, 4, True)
+    >>> sorted(stats.times)
+    ['assembly', 'format', 'latex', 'pad', 'parse', 'workers']
+
+    """
+
+    PHASES = ('parse', 'format', 'latex', 'pad', 'assembly', 'workers')
+
+    def __init__(self):
+        self.calls = 0
+        self.rows = 0
+        self.cells = 0
+        self.chars = 0
+        self.times = dict.fromkeys(self.PHASES, 0.0)
+
+    def __repr__(self):
+        times = ', '.join('{}={:.6f}'.format(phase, self.times[phase])
+                          for phase in self.PHASES)
+        return ('RenderStats(calls={}, rows={}, cells={}, chars={}, {})'
+                .format(self.calls, self.rows, self.cells, self.chars, times))
+
+    @_contextlib.contextmanager
+    def time(self, phase):
+        """Add the time spent in the ``with`` block to `phase`."""
+        start = _time.perf_counter()
+        try:
+            yield
+        finally:
+            self.times[phase] += _time.perf_counter() - start
+
+    def count(self, rows, cells):
+        """Add rendered `rows` and `cells` to the totals."""
+        self.rows += rows
+        self.cells += cells
+
+
+class _NoStats(object):
+    """Stand-in for `RenderStats` that records nothing, at almost no cost."""
+
+    _nothing = _contextlib.nullcontext()
+
+    def time(self, phase):
+        return self._nothing
+
+    def count(self, rows, cells):
+        pass
+
+
+_NO_STATS = _NoStats()
+
+
+class LatexCache(object):
+    r"""
+    Remember the LaTeX of arrays that have already been converted.
+
+    Pass one as `cache` to `to_ltx`, `LatexFormatter` or `to_ltx_many`.
+    An array converted again with the same options is looked up instead of
+    being formatted. Arrays are recognised by their contents (dtype, shape
+    and values), not by identity, so a copy of an array is found too.
+    Arrays and DataFrame columns of Python objects, and sparse matrices,
+    are always converted.
+
+    Parameters
+    ----------
+    maxsize   : int (optional: default 128)
+        Most conversions kept in memory. The least recently used ones are
+        dropped first.
+    maxchars  : int (optional: default None)
+        Most characters of LaTeX kept in memory, if given
+    directory : string (optional: default None)
+        Directory in which every conversion is also kept as a ``.tex``
+        file, so it is found again by later runs. Created if needed. Files
+        are never removed except by `clear`.
+
+    Attributes
+    ----------
+    hits   : int
+        Number of conversions found in the cache
+    misses : int
+        Number of conversions not found in the cache
+
+    Examples
+    --------
+    >>> import numpy as np
+    >>> import array_to_latex as a2l
+    >>> cache = a2l.LatexCache(maxsize=10)
+    >>> A = np.array([[1.23456, 23.45678],[456.23, 8.239521]])
+    >>> a2l.to_ltx(A, print_out=False, cache=cache) == a2l.to_ltx(
+    ...     A.copy(), print_out=False, cache=cache)
+    True
+    >>> cache.hits, cache.misses, len(cache)
+    (1, 1, 1)
+    >>> stats = a2l.RenderStats()
+    >>> latex = a2l.to_ltx(A, print_out=False, cache=cache, stats=stats)
+    >>> stats.calls, stats.rows, stats.chars == len(latex)
+    (1, 0, True)
+    >>> import pandas as pd
+    >>> mixed = pd.DataFrame({'x': pd.Series([1.5, 'a'], dtype=object)})
+    >>> latex = a2l.to_ltx(mixed, print_out=False, cache=cache)
+    >>> cache.hits, cache.misses, len(cache)
+    (2, 1, 1)
+
+    """
+
+    def __init__(self, maxsize=128, maxchars=None, directory=None):
+        self.maxsize = maxsize
+        self.maxchars = maxchars
+        self.directory = directory
+        self.hits = 0
+        self.misses = 0
+        self._entries = _collections.OrderedDict()
+        self._chars = 0
+        if directory is not None:
+            _os.makedirs(directory, exist_ok=True)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __getstate__(self):
+        # Worker processes get the settings and the directory, not the
+        # in-memory entries.
+        state = self.__dict__.copy()
+        state['_entries'] = _collections.OrderedDict()
+        state['_chars'] = 0
+        return state
+
+    def get(self, key):
+        """Return the LaTeX stored under `key`, or None."""
+        latex = self._entries.get(key)
+        if latex is not None:
+            self._entries.move_to_end(key)
+        elif self.directory is not None:
+            try:
+                with open(self._path(key), encoding='utf-8') as f:
+                    latex = f.read()
+            except FileNotFoundError:
+                pass
+            else:
+                self._remember(key, latex)
+        if latex is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return latex
+
+    def put(self, key, latex):
+        """Store `latex` under `key`."""
+        self._remember(key, latex)
+        if self.directory is not None:
+            # Written under a temporary name first, so other processes
+            # never read half a file.
+            path = self._path(key)
+            temporary = '{}.{}.tmp'.format(path, _os.getpid())
+            with open(temporary, 'w', encoding='utf-8') as f:
+                f.write(latex)
+            _os.replace(temporary, path)
+
+    def clear(self):
+        """Forget every conversion, including those in `directory`."""
+        self._entries.clear()
+        self._chars = 0
+        if self.directory is not None:
+            for name in _os.listdir(self.directory):
+                if name.endswith('.tex'):
+                    _os.remove(_os.path.join(self.directory, name))
+
+    def _path(self, key):
+        return _os.path.join(self.directory, key + '.tex')
+
+    def _remember(self, key, latex):
+        if key in self._entries:
+            self._chars -= len(self._entries.pop(key))
+        if self.maxchars is not None and len(latex) > self.maxchars:
+            return
+        self._entries[key] = latex
+        self._chars += len(latex)
+        while (len(self._entries) > self.maxsize
+               or (self.maxchars is not None and self._chars > self.maxchars)):
+            self._chars -= len(self._entries.popitem(last=False)[1])
+
+
+def _cachekey(a, options):
+    """Return a digest of the contents of `a` and of `options`.
+
+    Returns None if `a` cannot be recognised by its contents: arrays of
+    Python objects (whose buffer holds only pointers), DataFrames with
+    columns of Python objects, and anything that is not a numpy array or
+    DataFrame, such as a sparse matrix.
+    """
+    digest = _hashlib.blake2b(repr(options).encode(), digest_size=20)
+    if isinstance(a, _np.ndarray):
+        if a.dtype.hasobject:
+            return None
+        digest.update(repr((a.dtype, a.shape)).encode())
+        digest.update(_np.ascontiguousarray(a).reshape(-1).view(_np.uint8))
+    elif _is_dataframe(a):
+        # Pandas hashes the text of Python objects, so 1.5 and '1.5' in
+        # object columns (or categories) would share a key.
+        for dtype in a.dtypes:
+            categories = getattr(dtype, 'categories', None)
+            if (getattr(dtype, 'hasobject', False)
+                    or (categories is not None
+                        and getattr(categories.dtype, 'hasobject', False))):
+                return None
+        pandas = _sys.modules['pandas']
+        try:
+            rows = pandas.util.hash_pandas_object(a, index=True).to_numpy()
+        except TypeError:
+            return None
+        digest.update(repr((list(a.columns), [str(dtype) for dtype in a.dtypes],
+                            a.shape)).encode())
+        digest.update(rows)
+    else:
+        return None
+    return digest.hexdigest()
+
+
 def math_form(number, is_imaginary=False, mathform=True):
     if 'e' in number:
         if mathform:
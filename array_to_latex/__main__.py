@@ -0,0 +1,8 @@
+"""Run the ``array_to_latex`` command as ``python -m array_to_latex``."""
+
+import sys as _sys
+
+from array_to_latex.cli import main
+
+if __name__ == '__main__':
+    _sys.exit(main())
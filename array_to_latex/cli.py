@@ -0,0 +1,255 @@
+"""
+Convert arrays saved in files to LaTeX from the command line.
+
+Installed as the ``array_to_latex`` command; ``python -m array_to_latex``
+(see ``__main__.py``) does the same. Run it with ``--help`` for the
+options.
+"""
+
+import argparse as _argparse
+import glob as _glob
+import os as _os
+import sys as _sys
+
+import numpy as _np
+
+from array_to_latex import LatexFormatter, __version__
+
+_SUFFIXES = ('.npy', '.npz', '.csv')
+
+
+def _inputs(patterns):
+    """Return the files named by `patterns`, expanding any wildcards.
+
+    Patterns without wildcards are kept as they are, so that a missing file
+    is reported when it is converted.
+    """
+    paths = []
+    for pattern in patterns:
+        if _glob.has_magic(pattern):
+            matches = sorted(_glob.glob(pattern, recursive=True))
+            if not matches:
+                raise ValueError('no files match ' + pattern)
+            paths.extend(matches)
+        else:
+            paths.append(pattern)
+    # A file named twice, or matched by two patterns, is converted once.
+    return list(dict.fromkeys(paths))
+
+
+def _output(path, output_dir):
+    """Return the name of the ``.tex`` file `path` is converted to."""
+    name = _os.path.splitext(path)[0] + '.tex'
+    if output_dir is None:
+        return name
+    return _os.path.join(output_dir, _os.path.basename(name))
+
+
+def _clash(paths, outputs):
+    """Return a message if two of `paths` would be written to one output.
+
+    Returns None if every output is different.
+    """
+    seen = {}
+    for path, output in zip(paths, outputs):
+        key = _os.path.normcase(_os.path.abspath(output))
+        if key in seen:
+            return '{} and {} would both be written to {}'.format(
+                seen[key], path, output)
+        seen[key] = path
+    return None
+
+
+def _arrays(path):
+    """Yield the arrays saved in `path`, one at a time.
+
+    ``.npy`` files are memory-mapped, so they are read a block of rows at a
+    time as they are converted. ``.csv`` files are read with Pandas.
+    """
+    suffix = _os.path.splitext(path)[1].lower()
+    if suffix == '.npy':
+        yield _np.load(path, mmap_mode='r')
+    elif suffix == '.npz':
+        with _np.load(path) as archive:
+            for name in archive.files:
+                yield archive[name]
+    elif suffix == '.csv':
+        import pandas as _pd
+
+        yield _pd.read_csv(path)
+    else:
+        raise ValueError('cannot read {} files, only {}'
+                         .format(suffix or 'extensionless',
+                                 ', '.join(_SUFFIXES)))
+
+
+def _convert(path, output, formatter):
+    """Write the LaTeX of the arrays in `path` to `output`.
+
+    The arrays of a ``.npz`` file are separated by blank lines. `output` is
+    replaced only once the whole file is converted. Returns an error
+    message, or None if the file was converted.
+    """
+    temporary = '{}.{}.tmp'.format(output, _os.getpid())
+    try:
+        with open(temporary, 'w') as fileobj:
+            for i, a in enumerate(_arrays(path)):
+                if getattr(a, 'ndim', None) == 0:
+                    raise ValueError('cannot convert a 0-d array')
+                if i:
+                    fileobj.write('\n\n')
+                formatter.write(a, fileobj)
+            fileobj.write('\n')
+        _os.replace(temporary, output)
+    except Exception as error:
+        # Any failure is reported against this file; the others go on.
+        if _os.path.exists(temporary):
+            _os.remove(temporary)
+        return '{}: {}'.format(path, error)
+    return None
+
+
+def _positive(text):
+    """Return `text` as an integer of at least 1, for argparse."""
+    try:
+        number = int(text)
+    except ValueError:
+        number = 0
+    if number < 1:
+        raise _argparse.ArgumentTypeError('must be a positive integer')
+    return number
+
+
+def _parser():
+    """Return the parser of the command line arguments."""
+    parser = _argparse.ArgumentParser(
+        prog='array_to_latex',
+        description='Convert numpy arrays saved in .npy or .npz files and '
+                    'tables in .csv files to LaTeX. Each file is written '
+                    'to a .tex file of the same name.')
+    parser.add_argument('files', nargs='+', metavar='FILE',
+                        help='files to convert; wildcards such as *.npy '
+                             'are expanded')
+    parser.add_argument('-f', '--frmt', default='{:1.2f}',
+                        help='python 3 format of the numbers '
+                             '(default: %(default)s)')
+    parser.add_argument('-a', '--arraytype', default=None,
+                        help='LaTeX array type (default: bmatrix, or '
+                             'tabular for .csv files)')
+    parser.add_argument('-i', '--imstring', default='j',
+                        help='character for the square root of -1 '
+                             '(default: %(default)s)')
+    parser.add_argument('--column', action='store_true',
+                        help='write 1-D arrays as columns, not rows')
+    parser.add_argument('--no-mathform', action='store_true',
+                        help=r'keep 1.0e+03 instead of 1.0\times10^{03}')
+    parser.add_argument('--edgeitems', type=_positive, default=None,
+                        help='show only the first and last EDGEITEMS rows '
+                             'and columns of bigger arrays')
+    parser.add_argument('--maxpoints', type=_positive, default=None,
+                        help='with --arraytype coords, write at most '
+                             'MAXPOINTS evenly spaced points')
+    parser.add_argument('-o', '--output-dir', default=None,
+                        help='directory for the .tex files (default: next '
+                             'to each input file)')
+    parser.add_argument('-j', '--jobs', type=int, default=1,
+                        help='number of files converted at once '
+                             '(default: %(default)s)')
+    parser.add_argument('--version', action='version',
+                        version='%(prog)s ' + __version__)
+    return parser
+
+
+def main(argv=None):
+    r"""Run the ``array_to_latex`` command with arguments `argv`.
+
+    Returns the exit status: 0 if every file was converted, else 1.
+
+    Examples
+    --------
+    >>> import contextlib, io, os, shutil, sys, tempfile
+    >>> import numpy as np
+    >>> import pandas as pd
+    >>> from array_to_latex.cli import main
+    >>> folder = tempfile.mkdtemp()
+    >>> def path(name):
+    ...     return os.path.join(folder, name)
+    >>> np.save(path('a.npy'), np.array([[1.5, -2.0]]))
+    >>> np.savez(path('b.npz'), x=np.array([1.0]), y=np.array([[2.0], [3.0]]))
+    >>> pd.DataFrame({'p': [1.5]}).to_csv(path('c.csv'), index=False)
+    >>> main([path('*.np?'), path('c.csv'), '--jobs', '2'])
+    0
+    >>> print(open(path('a.tex')).read())
+    \begin{bmatrix}
+      1.50 & -2.00
+    \end{bmatrix}
+    >>> print(open(path('b.tex')).read())
+    \begin{bmatrix}
+      1.00
+    \end{bmatrix}
+    <BLANKLINE>
+    \begin{bmatrix}
+      2.00\\
+      3.00
+    \end{bmatrix}
+    >>> table = open(path('c.tex')).read()
+    >>> table.startswith('\\begin{tabular}'), ' 0 &  1.50' in table
+    (True, True)
+
+    A file that cannot be converted is reported, and the others still are:
+
+    >>> with open(path('d.txt'), 'w') as f:
+    ...     _ = f.write('1 2')
+    >>> os.remove(path('a.tex'))
+    >>> with contextlib.redirect_stderr(sys.stdout):
+    ...     main([path('d.txt'), path('a.npy')])
+    array_to_latex: ...d.txt: cannot read .txt files, only .npy, .npz, .csv
+    1
+    >>> os.path.exists(path('a.tex')), os.path.exists(path('d.tex'))
+    (True, False)
+
+    Two files that would be written to the same ``.tex`` file are refused:
+
+    >>> with contextlib.redirect_stderr(io.StringIO()) as err:
+    ...     main([path('a.npy'), path('a.csv')])
+    Traceback (most recent call last):
+    SystemExit: 2
+    >>> print(err.getvalue().splitlines()[-1])
+    array_to_latex: error: ...a.npy and ...a.csv would both be written to ...a.tex
+    >>> shutil.rmtree(folder)
+    """
+    parser = _parser()
+    args = parser.parse_args(argv)
+    try:
+        formatter = LatexFormatter(frmt=args.frmt, arraytype=args.arraytype,
+                                   imstring=args.imstring,
+                                   row=not args.column,
+                                   mathform=not args.no_mathform,
+                                   edgeitems=args.edgeitems,
+                                   maxpoints=args.maxpoints)
+        paths = _inputs(args.files)
+    except ValueError as error:
+        parser.error(str(error))
+    outputs = [_output(path, args.output_dir) for path in paths]
+    clash = _clash(paths, outputs)
+    if clash is not None:
+        parser.error(clash)
+    if args.output_dir is not None:
+        _os.makedirs(args.output_dir, exist_ok=True)
+    formatters = [formatter] * len(paths)
+
+    if args.jobs > 1 and len(paths) > 1:
+        import concurrent.futures as _futures
+
+        with _futures.ProcessPoolExecutor(max_workers=args.jobs) as executor:
+            errors = list(executor.map(_convert, paths, outputs, formatters))
+    else:
+        errors = list(map(_convert, paths, outputs, formatters))
+
+    status = 0
+    for error in errors:
+        if error is not None:
+            print('array_to_latex: ' + error, file=_sys.stderr)
+            status = 1
+    return status
+
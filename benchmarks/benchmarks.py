@@ -0,0 +1,130 @@
+"""
+Benchmarks for array_to_latex, run with airspeed velocity (asv).
+
+``asv run --python=same`` times the installed package offline, and
+``asv continuous master HEAD`` reports regressions between two commits.
+Every benchmark reports time (``time_*``) and peak memory (``peakmem_*``).
+"""
+
+import numpy as np
+import pandas as pd
+
+import array_to_latex as a2l
+
+SIZES = [10, 100, 500, 2000]
+
+
+def _array(n, dtype):
+    """Return an n x n array of `dtype` with a fixed seed."""
+    rng = np.random.default_rng(0)
+    a = rng.standard_normal((n, n)) * 10.0 ** rng.integers(-3, 4, (n, n))
+    if dtype == 'float64':
+        return a
+    if dtype == 'int':
+        return (a * 100).astype(np.int64)
+    if dtype == 'complex128':
+        return a + 1j * rng.standard_normal((n, n))
+    if dtype == 'str':
+        return np.char.mod('%.3g', a)
+    if dtype == 'object':
+        return a.astype(object)
+    raise ValueError(dtype)
+
+
+class NumpyDtypes(object):
+    """`to_ltx` and `_numpyarraytolatex` across array sizes and dtypes."""
+
+    params = [SIZES, ['float64', 'int', 'complex128', 'str', 'object']]
+    param_names = ['n', 'dtype']
+    timeout = 600
+
+    def setup(self, n, dtype):
+        self.a = _array(n, dtype)
+
+    def time_to_ltx(self, n, dtype):
+        a2l.to_ltx(self.a, print_out=False)
+
+    def peakmem_to_ltx(self, n, dtype):
+        a2l.to_ltx(self.a, print_out=False)
+
+    def time_numpyarraytolatex(self, n, dtype):
+        a2l._numpyarraytolatex(self.a, frmt='{:1.2f}')
+
+
+class ArrayTypes(object):
+    """`to_ltx` of float arrays for each `arraytype`."""
+
+    params = [SIZES, ['bmatrix', 'array', 'coords']]
+    param_names = ['n', 'arraytype']
+    timeout = 600
+
+    def setup(self, n, arraytype):
+        self.a = _array(n, 'float64')
+
+    def time_to_ltx(self, n, arraytype):
+        a2l.to_ltx(self.a, arraytype=arraytype, print_out=False)
+
+    def peakmem_to_ltx(self, n, arraytype):
+        a2l.to_ltx(self.a, arraytype=arraytype, print_out=False)
+
+
+class FormatSpecs(object):
+    """`to_ltx` of float arrays for common and unusual format strings."""
+
+    params = [[100, 1000],
+              ['{:6.2f}', '{:.3e}', '{:.3g}', '{:+08.3f}', '{:>10.2f}',
+               '{:,.2f}']]
+    param_names = ['n', 'frmt']
+    timeout = 600
+
+    def setup(self, n, frmt):
+        self.a = _array(n, 'float64')
+
+    def time_to_ltx(self, n, frmt):
+        a2l.to_ltx(self.a, frmt=frmt, print_out=False)
+
+    def peakmem_to_ltx(self, n, frmt):
+        a2l.to_ltx(self.a, frmt=frmt, print_out=False)
+
+
+class DataFrames(object):
+    """`to_ltx` and `_dataframetolatex` of numeric and mixed DataFrames."""
+
+    params = [[100, 10000, 100000], ['float', 'mixed'], ['tabular', 'bmatrix']]
+    param_names = ['rows', 'columns', 'arraytype']
+    timeout = 600
+
+    def setup(self, rows, columns, arraytype):
+        rng = np.random.default_rng(0)
+        data = {'x%d' % j: rng.standard_normal(rows) for j in range(8)}
+        if columns == 'mixed':
+            data['label'] = ['row %d' % i for i in range(rows)]
+            data['count'] = rng.integers(0, 1000, rows)
+            data['z'] = rng.standard_normal(rows) + 1j * rng.standard_normal(rows)
+        self.df = pd.DataFrame(data)
+
+    def time_to_ltx(self, rows, columns, arraytype):
+        a2l.to_ltx(self.df, arraytype=arraytype, print_out=False)
+
+    def peakmem_to_ltx(self, rows, columns, arraytype):
+        a2l.to_ltx(self.df, arraytype=arraytype, print_out=False)
+
+    def time_dataframetolatex(self, rows, columns, arraytype):
+        a2l._dataframetolatex(self.df, frmt='{:1.2f}', arraytype=arraytype)
+
+
+class ManySmall(object):
+    """Converting many small matrices, one call each or as one batch."""
+
+    params = [[100, 1000]]
+    param_names = ['count']
+
+    def setup(self, count):
+        self.arrays = [_array(4, 'float64') for _ in range(count)]
+
+    def time_to_ltx(self, count):
+        for a in self.arrays:
+            a2l.to_ltx(a, print_out=False)
+
+    def time_to_ltx_many(self, count):
+        a2l.to_ltx_many(self.arrays)
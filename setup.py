@@ -34,7 +34,10 @@ setup(name='array_to_latex',
       packages=['array_to_latex'],
       long_description=read('README.rst'),
       keywords=['latex', 'array', 'format', 'numpy', 'scipy'],
+      python_requires='>=3.8',
       install_requires=['numpy', 'pandas', 'clipboard'],
+      entry_points={'console_scripts':
+                    ['array_to_latex = array_to_latex.cli:main']},
       classifiers=['Development Status :: 5 - Production/Stable',
                    'Intended Audience :: Science/Research',
                    'License :: OSI Approved :: MIT License',
@@ -43,9 +46,13 @@ setup(name='array_to_latex',
                    'Intended Audience :: Education',
                    'Intended Audience :: Science/Research',
                    'Programming Language :: Python',
-                   'Programming Language :: Python :: 3.4',
-                   'Programming Language :: Python :: 3.5',
-                   'Programming Language :: Python :: 3.6',
+                   'Programming Language :: Python :: 3',
+                   'Programming Language :: Python :: 3 :: Only',
+                   'Programming Language :: Python :: 3.8',
+                   'Programming Language :: Python :: 3.9',
+                   'Programming Language :: Python :: 3.10',
+                   'Programming Language :: Python :: 3.11',
+                   'Programming Language :: Python :: 3.12',
                    'Topic :: Scientific/Engineering',
                    'Topic :: Text Processing :: Markup :: LaTeX',
                    'Operating System :: Microsoft :: Windows',